@@ -1,13 +1,24 @@
 from services.blockchain_service import BlockchainService
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import uuid
+import re
+import json
+import atexit
 import threading
+import time
 from datetime import datetime
 from dotenv import load_dotenv
 from database.mongodb import get_database, init_database
+from database.write_buffer import WriteBuffer
+from database.stats import CollectionStats
 from services.ai_service import AIService
+from services.event_bus import EventBus
+from services.storage_service import StorageService
+from services.ai.similarity import compute_lsh_bands, estimate_jaccard, build_candidate_pipeline
+from services.admission_control import AdmissionController, AdmissionRejected
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,9 +27,52 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Trust X-Forwarded-For only from the configured number of reverse proxies
+# in front of the app (e.g. 1 on Render); 0 uses the socket address
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+if TRUSTED_PROXY_HOPS > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
+# Each open stream holds one gunicorn thread (see Procfile); keep the rest for
+# other requests. The event bus is in-process, so run a single worker.
+SSE_MAX_STREAMS = int(os.getenv("SSE_MAX_STREAMS", "16"))
+
 # Initialize services
 ai_service = AIService()
 blockchain_service = BlockchainService()
+storage_service = StorageService()
+admission_controller = AdmissionController(reserved_threads=SSE_MAX_STREAMS)
+
+# Buffer for background status updates, flushed to MongoDB in bulk
+write_buffer = WriteBuffer()
+
+# Incrementally maintained collection statistics, flushed with the buffer
+collection_stats = CollectionStats(pre_reconcile=write_buffer.flush)
+write_buffer.add_flush_callback(collection_stats.flush)
+
+def shutdown_background_work():
+    """Drop queued processing jobs (marking their documents as errors), then flush buffered writes"""
+    admission_controller.shutdown()
+    write_buffer.close()
+
+# Registered after the write buffer's own handler, so it runs first
+atexit.register(shutdown_background_work)
+
+# Event bus for pushing status transitions to streaming clients
+event_bus = EventBus()
+
+# Server-Sent Events settings
+SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))
+SSE_MAX_DURATION = float(os.getenv("SSE_MAX_DURATION", "300"))
+SSE_MAX_DOCUMENTS = int(os.getenv("SSE_MAX_DOCUMENTS", "100"))
+
+active_streams = 0
+active_streams_lock = threading.Lock()
+
+# Maximum number of LSH band matches examined (split evenly across bands),
+# and of those the number scored, per similarity lookup (see benchmark_similarity.py)
+SIMILARITY_MAX_SCANNED = int(os.getenv("SIMILARITY_MAX_SCANNED", "10000"))
+SIMILARITY_MAX_CANDIDATES = int(os.getenv("SIMILARITY_MAX_CANDIDATES", "1000"))
 
 # Create storage directory
 os.makedirs("./storage", exist_ok=True)
@@ -26,36 +80,73 @@ os.makedirs("./storage", exist_ok=True)
 # Initialize database
 init_database()
 
+# Periodically correct drift in the collection statistics
+collection_stats.create_indexes()
+collection_stats.start_reconciler()
+
+def update_document_status(document_id, event_type, fields):
+    """Queue a document update and notify streaming clients"""
+    write_buffer.set_fields(document_id, fields)
+    event_bus.publish(document_id, event_type, fields)
+
+def get_client_id():
+    """Identify the client for per-client rate limits"""
+    return request.remote_addr
+
+def admission_rejected_response(error):
+    """Build the 429/503 response for a shed request"""
+    response = jsonify({"error": error.reason})
+    response.status_code = error.status_code
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+# Long-lived streams are not counted as reads in progress
+UNTRACKED_READ_ENDPOINTS = {"get_documents_events", "get_document_events"}
+
+@app.before_request
+def track_read_start():
+    """Count reads in progress so uploads yield to them under load"""
+    if request.method == "GET" and request.endpoint not in UNTRACKED_READ_ENDPOINTS:
+        admission_controller.begin_read()
+        g.read_tracked = True
+
+@app.teardown_request
+def track_read_end(exception=None):
+    if g.pop("read_tracked", False):
+        admission_controller.end_read()
+
 # Background processing function for AI
 def process_document_with_ai(document_id, file_path, content_type):
     """Process a document with AI in the background"""
+    status = "uploading"
     try:
-        # Get MongoDB database
-        db = get_database()
-        if db is None:
-            print("Database connection failed during AI processing")
-            return
-        
         # Process with AI
         ai_results = ai_service.process_document(document_id, file_path, content_type)
         
         # Update document metadata with AI results
-        db.documents.update_one(
-            {"documentId": document_id},
-            {
-                "$set": {
-                    "status": "processed",
-                    "dateModified": datetime.now().isoformat(),
-                    "tags": ai_results.get("tags", []),
-                    "aiMetadata": {
-                        "entities": ai_results.get("entities", []),
-                        "summary": ai_results.get("summary", ""),
-                        "language": ai_results.get("language", "unknown"),
-                        "characterCount": ai_results.get("characterCount", 0)
-                    }
-                }
+        update_document_status(document_id, "status", {
+            "status": "processed",
+            "dateModified": datetime.now().isoformat(),
+            "tags": ai_results.get("tags", []),
+            "aiMetadata": {
+                "entities": ai_results.get("entities", []),
+                "summary": ai_results.get("summary", ""),
+                "language": ai_results.get("language", "unknown"),
+                "characterCount": ai_results.get("characterCount", 0)
             }
-        )
+        })
+        collection_stats.record_status_change(status, "processed")
+        collection_stats.record_tags(ai_results.get("tags", []))
+        status = "processed"
+        
+        # Store the MinHash signature and its LSH bands for near-duplicate lookups
+        if ai_results.get("minhash"):
+            write_buffer.set_fields(document_id, {
+                "similarity": {
+                    "minhash": ai_results["minhash"],
+                    "bands": compute_lsh_bands(ai_results["minhash"])
+                }
+            })
         
         print(f"AI processing completed for document {document_id}")
         
@@ -65,27 +156,33 @@ def process_document_with_ai(document_id, file_path, content_type):
         print(f"Error in background AI processing: {str(e)}")
         
         # Update status to reflect error
-        if 'db' in locals() and db:
-            db.documents.update_one(
-                {"documentId": document_id},
-                {
-                    "$set": {
-                        "status": "error",
-                        "processingError": str(e)
-                    }
-                }
-            )
+        update_document_status(document_id, "status", {
+            "status": "error",
+            "processingError": str(e)
+        })
+        collection_stats.record_status_change(status, "error")
+
+def mark_processing_dropped(document_id, file_path, content_type):
+    """Mark a document whose queued processing was dropped on shutdown"""
+    update_document_status(document_id, "status", {
+        "status": "error",
+        "processingError": "Processing interrupted by shutdown",
+        "dateModified": datetime.now().isoformat()
+    })
+    collection_stats.record_status_change("uploading", "error")
+    update_document_status(document_id, "blockchain", {
+        "blockchainVerification": {
+            "status": "error",
+            "errorMessage": "Processing interrupted by shutdown",
+            "timestamp": datetime.now().isoformat()
+        }
+    })
+    collection_stats.record_blockchain_change("pending", "error")
 
 # Background processing function for blockchain
 def process_document_with_blockchain(document_id, file_path):
     """Register a document on the blockchain in the background"""
     try:
-        # Get MongoDB database
-        db = get_database()
-        if db is None:
-            print("Database connection failed during blockchain processing")
-            return
-        
         # Register document on blockchain
         blockchain_result = blockchain_service.register_document(
             document_id=document_id,
@@ -94,34 +191,26 @@ def process_document_with_blockchain(document_id, file_path):
         
         # Update document metadata with blockchain results
         if blockchain_result["status"] == "success":
-            db.documents.update_one(
-                {"documentId": document_id},
-                {
-                    "$set": {
-                        "blockchainVerification": {
-                            "status": "verified",
-                            "transactionId": blockchain_result.get("transactionId", ""),
-                            "timestamp": blockchain_result.get("timestamp", ""),
-                            "documentHash": blockchain_result.get("documentHash", "")
-                        }
-                    }
+            update_document_status(document_id, "blockchain", {
+                "blockchainVerification": {
+                    "status": "verified",
+                    "transactionId": blockchain_result.get("transactionId", ""),
+                    "timestamp": blockchain_result.get("timestamp", ""),
+                    "documentHash": blockchain_result.get("documentHash", "")
                 }
-            )
+            })
+            collection_stats.record_blockchain_change("pending", "verified")
             
             print(f"Blockchain registration completed for document {document_id}")
         else:
-            db.documents.update_one(
-                {"documentId": document_id},
-                {
-                    "$set": {
-                        "blockchainVerification": {
-                            "status": "error",
-                            "errorMessage": blockchain_result.get("message", "Unknown error"),
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    }
+            update_document_status(document_id, "blockchain", {
+                "blockchainVerification": {
+                    "status": "error",
+                    "errorMessage": blockchain_result.get("message", "Unknown error"),
+                    "timestamp": datetime.now().isoformat()
                 }
-            )
+            })
+            collection_stats.record_blockchain_change("pending", "error")
             
             print(f"Blockchain registration failed for document {document_id}")
     except Exception as e:
@@ -151,14 +240,26 @@ def upload_test():
 # Document upload with MongoDB and AI processing
 @app.route('/api/documents/upload-simple', methods=['POST'])
 def upload_document():
-    if 'file' not in request.files:
-        return jsonify({"error": "No file part"}), 400
+    # Chunked uploads have no size to reserve against the in-flight byte
+    # and disk limits, so require Content-Length
+    if request.content_length is None:
+        return jsonify({"error": "Content-Length required"}), 411
     
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({"error": "No selected file"}), 400
+    # Shed the upload before reading the request body if we are overloaded
+    try:
+        reserved_bytes = admission_controller.acquire_upload(get_client_id(), request.content_length)
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
     
+    upload_finished = False
     try:
+        if 'file' not in request.files:
+            return jsonify({"error": "No file part"}), 400
+        
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({"error": "No selected file"}), 400
+        
         # Get MongoDB database
         db = get_database()
         if db is None:
@@ -197,14 +298,19 @@ def upload_document():
         
         # Insert document metadata into MongoDB
         db.documents.insert_one(metadata)
+        collection_stats.record_insert(metadata["contentType"], metadata["fileSize"])
+        event_bus.publish(document_id, "status", {"status": "uploading"})
         
-        # Process with AI in the background
-        processing_thread = threading.Thread(
-            target=process_document_with_ai,
-            args=(document_id, f"documents/{document_id}/{file.filename}", file.content_type)
+        # Process with AI in the background; the stored bytes count as
+        # in flight until processing finishes
+        held_bytes = admission_controller.end_upload(reserved_bytes, metadata["fileSize"])
+        upload_finished = True
+        admission_controller.submit_job(
+            process_document_with_ai,
+            document_id, f"documents/{document_id}/{file.filename}", file.content_type,
+            held_bytes=held_bytes,
+            on_drop=mark_processing_dropped
         )
-        processing_thread.daemon = True
-        processing_thread.start()
         
         # Return information
         return jsonify({
@@ -216,6 +322,9 @@ def upload_document():
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    finally:
+        if not upload_finished:
+            admission_controller.end_upload(reserved_bytes)
 
 # Get all documents
 @app.route('/api/documents', methods=['GET'])
@@ -226,6 +335,10 @@ def get_documents():
         if db is None:
             return jsonify({"error": "Database connection failed"}), 500
         
+        # Read unflushed status updates before the query, so a flush
+        # completing in between is seen by the query instead of missed
+        pending_updates = write_buffer.get_all_pending()
+        
         # Query documents
         documents = list(db.documents.find({}, {
             "_id": 0,  # Exclude MongoDB _id field
@@ -239,6 +352,14 @@ def get_documents():
             "tags": 1
         }))
         
+        # Include status updates that have not been flushed yet
+        for document in documents:
+            write_buffer.apply_pending(
+                document,
+                fields=("status", "tags"),
+                pending=pending_updates.get(document.get("documentId"), {})
+            )
+        
         return jsonify({
             "status": "success",
             "count": len(documents),
@@ -256,12 +377,19 @@ def get_document(document_id):
         if db is None:
             return jsonify({"error": "Database connection failed"}), 500
         
+        # Read unflushed status updates before the query (see apply_pending)
+        pending = write_buffer.get_pending(document_id)
+        
         # Query document
-        document = db.documents.find_one({"documentId": document_id}, {"_id": 0})
+        document = db.documents.find_one({"documentId": document_id}, {"_id": 0, "similarity": 0})
         
         if document is None:
             return jsonify({"error": "Document not found"}), 404
         
+        # Include status updates that have not been flushed yet
+        write_buffer.apply_pending(document, pending=pending)
+        document.pop("similarity", None)
+        
         return jsonify({
             "status": "success",
             "document": document
@@ -269,6 +397,269 @@ def get_document(document_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def format_sse(event_type, data, event_id=None):
+    """Format a single Server-Sent Events message"""
+    message = ""
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    message += f"event: {event_type}\n"
+    message += f"data: {json.dumps(data)}\n\n"
+    return message
+
+def stream_document_events(document_ids):
+    """Stream status transitions for documents as Server-Sent Events
+
+    Reserves one of the SSE_MAX_STREAMS slots under the lock before doing
+    any work, so concurrent requests cannot all pass the limit check.
+    """
+    global active_streams
+    with active_streams_lock:
+        slot_reserved = active_streams < SSE_MAX_STREAMS
+        if slot_reserved:
+            active_streams += 1
+    if not slot_reserved:
+        response = jsonify({"error": "Too many open event streams"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(int(SSE_HEARTBEAT_INTERVAL))
+        return response
+
+    released = threading.Event()
+
+    def release_slot():
+        """Free the slot once, from whichever path finishes the request"""
+        global active_streams
+        with active_streams_lock:
+            if not released.is_set():
+                released.set()
+                active_streams -= 1
+
+    try:
+        response = app.make_response(open_document_event_stream(document_ids, release_slot))
+    except Exception:
+        release_slot()
+        raise
+    if response.mimetype != "text/event-stream":
+        # Error response, no stream was opened
+        release_slot()
+    else:
+        # Covers a client that disconnects before the generator starts
+        response.call_on_close(release_slot)
+    return response
+
+def open_document_event_stream(document_ids, release_slot):
+    """Build the event stream response, or an error response
+
+    Args:
+        document_ids: IDs of the documents to stream
+        release_slot: Called when the stream ends
+    """
+    document_ids = set(document_ids)
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Invalid Last-Event-ID"}), 400
+
+    snapshot = []
+    if last_event_id is None or not event_bus.can_resume(last_event_id):
+        # New subscription: send the current state first so transitions
+        # that happened before the client connected are not missed
+        last_event_id = event_bus.last_event_id
+        db = get_database()
+        if db is None:
+            return jsonify({"error": "Database connection failed"}), 500
+        pending_updates = {document_id: write_buffer.get_pending(document_id) for document_id in document_ids}
+        documents = db.documents.find(
+            {"documentId": {"$in": list(document_ids)}},
+            {"_id": 0, "documentId": 1, "status": 1, "blockchainVerification": 1}
+        )
+        snapshot = [
+            write_buffer.apply_pending(
+                document,
+                fields=("status", "blockchainVerification"),
+                pending=pending_updates.get(document.get("documentId"), {})
+            )
+            for document in documents
+        ]
+        if not snapshot:
+            return jsonify({"error": "Document not found"}), 404
+
+    def generate():
+        try:
+            after_id = last_event_id
+            yield "retry: 3000\n\n"
+            for document in snapshot:
+                yield format_sse("snapshot", document, after_id)
+
+            started = time.monotonic()
+            last_sent = started
+            while time.monotonic() - started < SSE_MAX_DURATION:
+                events, latest_id = event_bus.wait_for_events(document_ids, after_id, timeout=SSE_HEARTBEAT_INTERVAL)
+                for event in events:
+                    yield format_sse(event["event"], {
+                        "documentId": event["documentId"],
+                        "timestamp": event["timestamp"],
+                        **event["data"]
+                    }, event["id"])
+                    last_sent = time.monotonic()
+                # Skip past events for other documents even if none matched
+                after_id = max(after_id, latest_id)
+                if time.monotonic() - last_sent >= SSE_HEARTBEAT_INTERVAL:
+                    yield ": heartbeat\n\n"
+                    last_sent = time.monotonic()
+        finally:
+            release_slot()
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+# Stream status events for a batch of documents
+@app.route('/api/documents/events', methods=['GET'])
+def get_documents_events():
+    document_ids = [i for i in request.args.get("ids", "").split(",") if i]
+    if not document_ids:
+        return jsonify({"error": "No document IDs provided"}), 400
+    if len(document_ids) > SSE_MAX_DOCUMENTS:
+        return jsonify({"error": f"At most {SSE_MAX_DOCUMENTS} document IDs allowed"}), 400
+
+    try:
+        return stream_document_events(document_ids)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Stream status events for one document
+@app.route('/api/documents/<document_id>/events', methods=['GET'])
+def get_document_events(document_id):
+    try:
+        return stream_document_events([document_id])
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Download document, decompressing transparently if it is in the cold tier
+@app.route('/api/documents/<document_id>/download', methods=['GET'])
+def download_document(document_id):
+    try:
+        # Get MongoDB database
+        db = get_database()
+        if db is None:
+            return jsonify({"error": "Database connection failed"}), 500
+        
+        # Get document
+        document = db.documents.find_one({"documentId": document_id}, {"_id": 0, "path": 1, "filename": 1, "contentType": 1})
+        if not document or not storage_service.exists(document.get("path", "")):
+            return jsonify({"error": "Document not found"}), 404
+        
+        file_path = document["path"]
+        size = storage_service.get_size(file_path)
+        start, end = 0, size - 1
+        status_code = 200
+        
+        # Serve a single byte range; only the chunks it covers are decompressed
+        range_match = re.match(r"bytes=(\d*)-(\d*)$", request.headers.get("Range", ""))
+        if range_match and any(range_match.groups()):
+            first, last = range_match.groups()
+            if first:
+                start = int(first)
+                end = min(int(last), size - 1) if last else size - 1
+            else:
+                start = max(size - int(last), 0)
+            if start > end:
+                return Response(status=416, headers={"Content-Range": f"bytes */{size}"})
+            status_code = 206
+        
+        def generate():
+            with storage_service.open(file_path) as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    data = f.read(min(65536, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data)
+                    yield data
+        
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(max(end - start + 1, 0)),
+            "Content-Disposition": f'attachment; filename="{document.get("filename", "")}"'
+        }
+        if status_code == 206:
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        
+        return Response(generate(), status=status_code, headers=headers,
+                        mimetype=document.get("contentType") or "application/octet-stream")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Get storage tier metrics
+@app.route('/api/storage/stats', methods=['GET'])
+def get_storage_stats():
+    try:
+        return jsonify({
+            "status": "success",
+            "storage": storage_service.get_metrics()
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Find near-duplicates of a document
+@app.route('/api/documents/<document_id>/similar', methods=['GET'])
+def get_similar_documents(document_id):
+    try:
+        threshold = request.args.get("threshold", 0.5, type=float)
+        limit = request.args.get("limit", 10, type=int)
+        
+        # Get MongoDB database
+        db = get_database()
+        if db is None:
+            return jsonify({"error": "Database connection failed"}), 500
+        
+        # Get the document's signature, including one that has not been flushed yet
+        pending = write_buffer.get_pending(document_id)
+        document = db.documents.find_one({"documentId": document_id}, {"_id": 0, "documentId": 1, "similarity": 1})
+        if document is None:
+            return jsonify({"error": "Document not found"}), 404
+        write_buffer.apply_pending(document, fields=("similarity",), pending=pending)
+        
+        similarity = document.get("similarity")
+        if not similarity:
+            return jsonify({
+                "status": "success",
+                "documentId": document_id,
+                "message": "Document has no similarity signature",
+                "similar": []
+            })
+        
+        # Candidates share at least one LSH band; the multikey index keeps this
+        # sublinear. The ones sharing the most bands are scored first.
+        candidates = db.documents.aggregate(build_candidate_pipeline(
+            "documents", document_id, similarity["bands"], SIMILARITY_MAX_SCANNED, SIMILARITY_MAX_CANDIDATES
+        ))
+        
+        matches = []
+        for candidate in candidates:
+            score = estimate_jaccard(similarity["minhash"], candidate["minhash"])
+            if score >= threshold:
+                matches.append({
+                    "documentId": candidate["documentId"],
+                    "filename": candidate.get("filename"),
+                    "title": candidate.get("title"),
+                    "estimatedJaccard": score
+                })
+        
+        matches.sort(key=lambda match: match["estimatedJaccard"], reverse=True)
+        
+        return jsonify({
+            "status": "success",
+            "documentId": document_id,
+            "count": len(matches[:limit]),
+            "similar": matches[:limit]
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # Get blockchain info
 @app.route('/api/blockchain/info', methods=['GET'])
 def get_blockchain_info():
@@ -278,6 +669,53 @@ def get_blockchain_info():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Get collection statistics
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    try:
+        top_tags = request.args.get("topTags", 10, type=int)
+        return jsonify({
+            "status": "success",
+            "stats": collection_stats.get_stats(top_tags=top_tags)
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Recompute collection statistics from the documents collection
+@app.route('/api/stats/reconcile', methods=['POST'])
+def reconcile_stats():
+    try:
+        if not collection_stats.reconcile():
+            return jsonify({"error": "Stats reconciliation failed"}), 500
+        return jsonify({
+            "status": "success",
+            "stats": collection_stats.get_stats()
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Get admission control counters
+@app.route('/api/admission/stats', methods=['GET'])
+def get_admission_stats():
+    try:
+        return jsonify({
+            "status": "success",
+            "admission": admission_controller.get_stats()
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Get write buffer counters
+@app.route('/api/write-buffer/stats', methods=['GET'])
+def get_write_buffer_stats():
+    try:
+        return jsonify({
+            "status": "success",
+            "writeBuffer": write_buffer.get_stats()
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # Verify document on blockchain
 @app.route('/api/documents/<document_id>/verify', methods=['GET'])
 def verify_document_on_blockchain(document_id):
@@ -0,0 +1,155 @@
+"""Benchmark near-duplicate lookups over synthetic MinHash signatures
+
+Builds random signatures, plants near-duplicates of a query document and
+a group of documents that share one common LSH band with it (as boilerplate
+text would), then times candidate lookups with and without the scan cap.
+
+Usage (from the api directory):
+    python benchmark_similarity.py                        # in-memory LSH index
+    python benchmark_similarity.py --documents 300000     # larger collection (memory grows with it)
+    python benchmark_similarity.py --mongodb              # against MONGODB_URI
+"""
+import argparse
+import random
+import time
+from dotenv import load_dotenv
+from services.ai.similarity import (
+    SIGNATURE_SIZE, LSH_BANDS, LSH_ROWS, compute_lsh_bands, estimate_jaccard, build_candidate_pipeline
+)
+
+BENCHMARK_COLLECTION = "similarity_benchmark"
+
+def random_signature(rng):
+    """Signature of an unrelated document"""
+    return [rng.getrandbits(56) for _ in range(SIGNATURE_SIZE)]
+
+def near_duplicate(signature, similarity, rng):
+    """Signature of a document whose Jaccard similarity is about `similarity`"""
+    return [value if rng.random() < similarity else rng.getrandbits(56) for value in signature]
+
+def common_band(signature, rng):
+    """Signature sharing only the first LSH band with `signature`"""
+    return signature[:LSH_ROWS] + random_signature(rng)[LSH_ROWS:]
+
+def generate_documents(args, query, rng):
+    """Yield (documentId, signature, isDuplicate) for the synthetic collection"""
+    for number in range(args.duplicates):
+        yield f"duplicate-{number}", near_duplicate(query, rng.uniform(0.7, 0.95), rng), True
+    for number in range(args.common):
+        yield f"common-{number}", common_band(query, rng), False
+    for number in range(args.documents - args.duplicates - args.common):
+        yield f"random-{number}", random_signature(rng), False
+
+def rank_candidates(index, signatures, bands, max_scanned, max_candidates):
+    """In-memory equivalent of build_candidate_pipeline()"""
+    per_band = max(1, max_scanned // len(bands))
+    shared_bands = {}
+    for band in bands:
+        for document_id in index.get(band, ())[:per_band]:
+            shared_bands[document_id] = shared_bands.get(document_id, 0) + 1
+    ranked = sorted(shared_bands.items(), key=lambda item: item[1], reverse=True)[:max_candidates]
+    return [(document_id, signatures[document_id]) for document_id, _ in ranked]
+
+def scan_limits(args):
+    """Lookups to compare: every band match, then the capped scan"""
+    return [("uncapped", args.documents * LSH_BANDS), (f"max scanned {args.max_scanned}", args.max_scanned)]
+
+def report(label, elapsed, candidates, query, duplicate_ids, threshold):
+    """Print latency and recall of one lookup"""
+    found = {
+        document_id for document_id, signature in candidates
+        if estimate_jaccard(query, signature) >= threshold
+    }
+    recall = len(found & duplicate_ids) / len(duplicate_ids) if duplicate_ids else 1.0
+    print(f"{label:>28}: {elapsed * 1000:8.1f} ms, {len(candidates)} candidates, recall {recall:.2f}")
+
+def run_in_memory(args, query, documents):
+    """Benchmark an in-memory band -> documents index"""
+    started = time.perf_counter()
+    index = {}
+    signatures = {}
+    duplicate_ids = set()
+    for document_id, signature, is_duplicate in documents:
+        signatures[document_id] = signature
+        if is_duplicate:
+            duplicate_ids.add(document_id)
+        for band in compute_lsh_bands(signature):
+            index.setdefault(band, []).append(document_id)
+    print(f"Indexed {len(signatures)} signatures in {time.perf_counter() - started:.1f}s")
+
+    bands = compute_lsh_bands(query)
+    for label, max_scanned in scan_limits(args):
+        started = time.perf_counter()
+        candidates = rank_candidates(index, signatures, bands, max_scanned, args.max_candidates)
+        report(label, time.perf_counter() - started, candidates, query, duplicate_ids, args.threshold)
+
+def run_mongodb(args, query, documents):
+    """Benchmark the aggregation pipeline against a scratch collection"""
+    from database.mongodb import get_database
+
+    db = get_database()
+    if db is None:
+        raise SystemExit("Database connection failed")
+    collection = db[BENCHMARK_COLLECTION]
+    collection.drop()
+    collection.create_index("similarity.bands")
+
+    started = time.perf_counter()
+    batch = []
+    duplicate_ids = set()
+    for document_id, signature, is_duplicate in documents:
+        if is_duplicate:
+            duplicate_ids.add(document_id)
+        batch.append({
+            "documentId": document_id,
+            "similarity": {"minhash": signature, "bands": compute_lsh_bands(signature)}
+        })
+        if len(batch) >= 10000:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+    print(f"Inserted {collection.estimated_document_count()} signatures in {time.perf_counter() - started:.1f}s")
+
+    bands = compute_lsh_bands(query)
+    try:
+        for label, max_scanned in scan_limits(args):
+            started = time.perf_counter()
+            pipeline = build_candidate_pipeline(BENCHMARK_COLLECTION, "query", bands, max_scanned, args.max_candidates)
+            candidates = [
+                (candidate["documentId"], candidate["minhash"])
+                for candidate in collection.aggregate(pipeline, allowDiskUse=True)
+            ]
+            report(label, time.perf_counter() - started, candidates, query, duplicate_ids, args.threshold)
+    finally:
+        if not args.keep:
+            collection.drop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LSH near-duplicate lookups")
+    parser.add_argument("--documents", type=int, default=100000, help="Number of synthetic documents")
+    parser.add_argument("--duplicates", type=int, default=50, help="Near-duplicates of the query document")
+    parser.add_argument("--common", type=int, default=50000, help="Documents sharing one LSH band with the query")
+    parser.add_argument("--max-scanned", type=int, default=10000, help="SIMILARITY_MAX_SCANNED to compare against")
+    parser.add_argument("--max-candidates", type=int, default=1000, help="SIMILARITY_MAX_CANDIDATES")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Minimum estimated Jaccard similarity")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--mongodb", action="store_true", help=f"Use the {BENCHMARK_COLLECTION} collection at MONGODB_URI")
+    parser.add_argument("--keep", action="store_true", help="Keep the MongoDB collection afterwards")
+    args = parser.parse_args()
+    args.common = min(args.common, args.documents - args.duplicates)
+
+    rng = random.Random(args.seed)
+    query = random_signature(rng)
+    documents = generate_documents(args, query, rng)
+    print(f"{args.documents} documents, {args.duplicates} near-duplicates, "
+          f"{args.common} sharing one band, {LSH_BANDS} bands of {LSH_ROWS} rows")
+
+    if args.mongodb:
+        load_dotenv()
+        run_mongodb(args, query, documents)
+    else:
+        run_in_memory(args, query, documents)
+
+if __name__ == "__main__":
+    main()
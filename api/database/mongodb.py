@@ -58,6 +58,7 @@ def init_database():
         # Create indexes for better query performance
         db.documents.create_index("documentId", unique=True)
         db.documents.create_index("dateCreated")
+        db.documents.create_index("similarity.bands")  # LSH band index for near-duplicates
         
         print("Database initialized successfully!")
         return True
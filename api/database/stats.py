@@ -0,0 +1,323 @@
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pymongo import UpdateOne, DESCENDING
+from database.mongodb import get_database
+
+# Seconds between reconciliation runs, configurable via environment variable
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))
+
+STATS_MAX_TOP_TAGS = 100
+
+STATS_DOCUMENT_ID = "documents"
+STATS_GROUPS = ("byStatus", "byContentType", "byBlockchainStatus")
+
+# Content types are client-supplied, so only these get their own counter
+# and everything else is counted as "other"; keeps the stats document bounded
+STATS_CONTENT_TYPES = (
+    "application/pdf",
+    "text/plain",
+    "text/markdown",
+    "text/csv",
+    "text/html",
+    "application/msword",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "image/png",
+    "image/jpeg",
+    "application/octet-stream"
+)
+STATS_OTHER_CONTENT_TYPE = "other"
+
+def normalize_content_type(content_type):
+    """Map a content type to its stats counter key"""
+    return content_type if content_type in STATS_CONTENT_TYPES else STATS_OTHER_CONTENT_TYPE
+
+def encode_key(key):
+    """Encode a value for use as a MongoDB field name ("." and "$" are reserved)"""
+    return str(key).replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+def decode_key(key):
+    """Reverse encode_key"""
+    return key.replace("%24", "$").replace("%2E", ".").replace("%25", "%")
+
+class CollectionStats:
+    """Incrementally maintained statistics for the documents collection
+
+    Counters live in a single stats document and are updated with "$inc"
+    as documents are inserted and change status, so reading them does not
+    depend on the size of the collection. Tag counts are unbounded, so
+    each tag gets its own counter document, and the top tags are read
+    through an index on the count. Increments are accumulated in memory
+    and applied once per flush.
+    """
+
+    def __init__(self, collection_name="stats", tag_collection_name="tag_stats",
+                 source_collection_name="documents", pre_reconcile=None):
+        """Initialize the statistics tracker
+
+        Args:
+            collection_name: Collection holding the stats document
+            tag_collection_name: Collection holding one counter document per tag
+            source_collection_name: Collection the statistics describe
+            pre_reconcile: Function called before reconciling, e.g. to flush
+                buffered document updates the aggregation must see
+        """
+        self.collection_name = collection_name
+        self.tag_collection_name = tag_collection_name
+        self.source_collection_name = source_collection_name
+        self.pre_reconcile = pre_reconcile
+        self._db = None
+        self._pending = Counter()  # dotted field path -> increment
+        self._pending_tags = Counter()  # tag -> increment
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._reconciler = None
+
+    def record_insert(self, content_type, file_size, status="uploading", blockchain_status="pending"):
+        """Count a newly inserted document
+
+        Args:
+            content_type: MIME type of the document
+            file_size: Size of the stored file in bytes
+            status: Initial processing status
+            blockchain_status: Initial blockchain verification status
+        """
+        self._increment({
+            "totalDocuments": 1,
+            "totalBytes": file_size or 0,
+            f"byStatus.{encode_key(status)}": 1,
+            f"byContentType.{encode_key(normalize_content_type(content_type))}": 1,
+            f"byBlockchainStatus.{encode_key(blockchain_status)}": 1
+        })
+
+    def record_status_change(self, old_status, new_status):
+        """Move a document from one processing status to another"""
+        if old_status == new_status:
+            return
+        self._increment({
+            f"byStatus.{encode_key(old_status)}": -1,
+            f"byStatus.{encode_key(new_status)}": 1
+        })
+
+    def record_blockchain_change(self, old_status, new_status):
+        """Move a document from one blockchain verification status to another"""
+        if old_status == new_status:
+            return
+        self._increment({
+            f"byBlockchainStatus.{encode_key(old_status)}": -1,
+            f"byBlockchainStatus.{encode_key(new_status)}": 1
+        })
+
+    def record_tags(self, tags):
+        """Count tags added to a document"""
+        with self._lock:
+            self._pending_tags.update(tags)
+
+    def flush(self):
+        """Apply accumulated increments to the stats document
+
+        Returns:
+            True if the increments were written (or nothing was pending)
+        """
+        with self._flush_lock:
+            with self._lock:
+                increments = {field: value for field, value in self._pending.items() if value}
+                tag_increments = {tag: value for tag, value in self._pending_tags.items() if value}
+                self._pending = Counter()
+                self._pending_tags = Counter()
+            if not increments and not tag_increments:
+                return True
+
+            try:
+                db = self._get_db()
+                if db is None:
+                    raise RuntimeError("Database connection failed")
+                if increments:
+                    db[self.collection_name].update_one(
+                        {"_id": STATS_DOCUMENT_ID},
+                        {"$inc": increments},
+                        upsert=True
+                    )
+                    increments = {}
+                if tag_increments:
+                    db[self.tag_collection_name].bulk_write([
+                        UpdateOne({"_id": tag}, {"$inc": {"count": value}}, upsert=True)
+                        for tag, value in tag_increments.items()
+                    ], ordered=False)
+                return True
+            except Exception as e:
+                print(f"Error flushing collection stats: {str(e)}")
+                self._db = None
+                with self._lock:
+                    self._pending.update(increments)
+                    self._pending_tags.update(tag_increments)
+                return False
+
+    def get_stats(self, top_tags=10):
+        """Get the current statistics
+
+        Args:
+            top_tags: Number of most frequent tags to return, clamped to
+                1..STATS_MAX_TOP_TAGS (a 0 limit would return every tag)
+
+        Returns:
+            Dict of totals and per-group counts
+        """
+        top_tags = min(max(top_tags, 1), STATS_MAX_TOP_TAGS)
+        db = self._get_db()
+        if db is None:
+            raise RuntimeError("Database connection failed")
+
+        stats = db[self.collection_name].find_one({"_id": STATS_DOCUMENT_ID}) or {}
+
+        # Include increments that have not been flushed yet
+        with self._lock:
+            pending = dict(self._pending)
+            pending_tags = dict(self._pending_tags)
+        for field, value in pending.items():
+            if "." in field:
+                group, key = field.split(".", 1)
+                counts = stats.setdefault(group, {})
+                counts[key] = counts.get(key, 0) + value
+            else:
+                stats[field] = stats.get(field, 0) + value
+
+        result = {
+            "totalDocuments": stats.get("totalDocuments", 0),
+            "totalBytes": stats.get("totalBytes", 0),
+            "dateReconciled": stats.get("dateReconciled")
+        }
+        for group in ("byStatus", "byContentType", "byBlockchainStatus"):
+            result[group] = {
+                decode_key(key): count
+                for key, count in stats.get(group, {}).items() if count > 0
+            }
+
+        # Indexed top-k read; unflushed increments are merged into it
+        tags = {
+            row["_id"]: row["count"]
+            for row in db[self.tag_collection_name].find().sort("count", DESCENDING).limit(top_tags)
+        }
+        for tag, value in pending_tags.items():
+            tags[tag] = tags.get(tag, 0) + value
+        tags = sorted(tags.items(), key=lambda item: item[1], reverse=True)
+        result["topTags"] = [
+            {"tag": tag, "count": count}
+            for tag, count in tags[:top_tags] if count > 0
+        ]
+        return result
+
+    def reconcile(self):
+        """Recompute the statistics from the documents collection
+
+        Corrects drift in the counters. Buffered document updates are
+        flushed first through pre_reconcile. Increments recorded while the
+        aggregation runs may be counted twice or missed; the next run
+        corrects them again.
+
+        Returns:
+            True if the stats document was rewritten
+        """
+        db = self._get_db()
+        if db is None:
+            print("Database connection failed during stats reconciliation")
+            return False
+
+        try:
+            if self.pre_reconcile is not None:
+                self.pre_reconcile()
+            self.flush()
+            pipeline = [{
+                "$facet": {
+                    "totals": [{"$group": {
+                        "_id": None,
+                        "totalDocuments": {"$sum": 1},
+                        "totalBytes": {"$sum": {"$ifNull": ["$fileSize", 0]}}
+                    }}],
+                    "byStatus": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+                    # Same mapping as normalize_content_type()
+                    "byContentType": [{"$group": {
+                        "_id": {"$cond": [
+                            {"$in": ["$contentType", list(STATS_CONTENT_TYPES)]},
+                            "$contentType",
+                            STATS_OTHER_CONTENT_TYPE
+                        ]},
+                        "count": {"$sum": 1}
+                    }}],
+                    "byBlockchainStatus": [{"$group": {
+                        "_id": "$blockchainVerification.status", "count": {"$sum": 1}
+                    }}]
+                }
+            }]
+            facets = next(db[self.source_collection_name].aggregate(pipeline, allowDiskUse=True))
+
+            totals = facets["totals"][0] if facets["totals"] else {}
+            stats = {
+                "totalDocuments": totals.get("totalDocuments", 0),
+                "totalBytes": totals.get("totalBytes", 0),
+                "dateReconciled": datetime.now().isoformat()
+            }
+            for group in STATS_GROUPS:
+                stats[group] = {
+                    encode_key(row["_id"]): row["count"]
+                    for row in facets[group] if row["_id"] is not None
+                }
+
+            db[self.collection_name].replace_one({"_id": STATS_DOCUMENT_ID}, stats, upsert=True)
+
+            # Rebuild tag counters server-side ($merge has no document size
+            # limit), then drop tags this run did not see. Counters upserted
+            # by flushes meanwhile have no reconciled stamp and are kept.
+            db[self.source_collection_name].aggregate([
+                {"$unwind": "$tags"},
+                {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+                {"$set": {"reconciled": stats["dateReconciled"]}},
+                {"$merge": {"into": self.tag_collection_name, "whenMatched": "replace"}}
+            ], allowDiskUse=True)
+            db[self.tag_collection_name].delete_many({"reconciled": {"$lt": stats["dateReconciled"]}})
+            print("Collection stats reconciled")
+            return True
+        except Exception as e:
+            print(f"Error reconciling collection stats: {str(e)}")
+            return False
+
+    def start_reconciler(self, interval=STATS_RECONCILE_INTERVAL):
+        """Run reconcile() periodically in a background thread
+
+        Args:
+            interval: Seconds between runs; 0 disables the reconciler
+        """
+        if interval <= 0 or self._reconciler is not None:
+            return
+
+        def run():
+            # Build the stats document right away if it does not exist yet
+            db = self._get_db()
+            if db is not None and db[self.collection_name].count_documents({"_id": STATS_DOCUMENT_ID}) == 0:
+                self.reconcile()
+            while True:
+                time.sleep(interval)
+                self.reconcile()
+
+        self._reconciler = threading.Thread(target=run)
+        self._reconciler.daemon = True
+        self._reconciler.start()
+
+    def create_indexes(self):
+        """Create the index used to read the top tags"""
+        db = self._get_db()
+        if db is not None:
+            db[self.tag_collection_name].create_index([("count", DESCENDING)])
+
+    def _increment(self, fields):
+        """Accumulate increments until the next flush"""
+        with self._lock:
+            self._pending.update(fields)
+
+    def _get_db(self):
+        """Reuse one database handle instead of connecting per update"""
+        if self._db is None:
+            self._db = get_database()
+        return self._db
@@ -0,0 +1,235 @@
+import os
+import atexit
+import threading
+import time
+from pymongo import UpdateOne
+from database.mongodb import get_database
+
+# Flush thresholds, configurable via environment variables
+WRITE_BUFFER_MAX_PENDING = int(os.getenv("WRITE_BUFFER_MAX_PENDING", "500"))
+WRITE_BUFFER_FLUSH_INTERVAL = float(os.getenv("WRITE_BUFFER_FLUSH_INTERVAL", "1.0"))
+
+class WriteBuffer:
+    """Write-behind buffer for document status updates
+
+    Coalesces "$set" updates per documentId and writes them to MongoDB
+    as ordered bulk_write batches once enough documents are pending or
+    the flush interval has elapsed.
+    """
+
+    def __init__(self, collection_name="documents", max_pending=WRITE_BUFFER_MAX_PENDING,
+                 flush_interval=WRITE_BUFFER_FLUSH_INTERVAL):
+        """Initialize the write buffer
+
+        Args:
+            collection_name: Name of the collection updates are applied to
+            max_pending: Number of pending documents that triggers a flush
+            flush_interval: Maximum number of seconds an update stays buffered
+        """
+        self.collection_name = collection_name
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._db = None
+        self._pending = {}  # documentId -> merged "$set" fields
+        self._inflight = {}  # batch being written by flush(), still visible to readers
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._flush_callbacks = []
+        self._counters = {
+            "queued": 0,
+            "coalesced": 0,
+            "flushed": 0,
+            "failed": 0,
+            "batches": 0
+        }
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.close)
+
+    def set_fields(self, document_id, fields):
+        """Queue a "$set" update for a document
+
+        Args:
+            document_id: Document ID
+            fields: Dict of fields to set; later values win per field
+        """
+        with self._lock:
+            pending = self._pending.get(document_id)
+            if pending is None:
+                self._pending[document_id] = dict(fields)
+            else:
+                pending.update(fields)
+                self._counters["coalesced"] += 1
+            self._counters["queued"] += 1
+            should_flush = len(self._pending) >= self.max_pending
+
+        if should_flush:
+            self._wakeup.set()
+
+    def add_flush_callback(self, callback):
+        """Register a function called after every periodic flush and on close
+
+        Lets other buffered writers (e.g. collection statistics) share
+        the flusher thread and shutdown handling.
+
+        Args:
+            callback: Function taking no arguments
+        """
+        self._flush_callbacks.append(callback)
+
+    def get_pending(self, document_id):
+        """Get the buffered, not yet flushed fields for a document
+
+        Args:
+            document_id: Document ID
+
+        Returns:
+            Dict of pending fields (empty if nothing is buffered)
+        """
+        with self._lock:
+            fields = dict(self._inflight.get(document_id, {}))
+            fields.update(self._pending.get(document_id, {}))
+            return fields
+
+    def get_all_pending(self):
+        """Get the buffered, not yet flushed fields for every document
+
+        Returns:
+            Dict of documentId -> pending fields (copies)
+        """
+        with self._lock:
+            snapshot = {document_id: dict(fields) for document_id, fields in self._inflight.items()}
+            for document_id, fields in self._pending.items():
+                snapshot.setdefault(document_id, {}).update(fields)
+            return snapshot
+
+    def apply_pending(self, document, fields=None, pending=None):
+        """Overlay buffered updates on a document read from MongoDB
+
+        Gives the status endpoints read-your-writes consistency while
+        updates are still waiting to be flushed. Read the buffer with
+        get_pending() BEFORE querying MongoDB and pass it in as pending:
+        a flush that completes between the two reads then shows up in
+        the query result, while reading the buffer after the query could
+        miss the update in both places.
+
+        Args:
+            document: Document dict containing a documentId field
+            fields: Only overlay these fields (e.g. those a query projected)
+            pending: Fields from get_pending(), read before the query
+
+        Returns:
+            The same document dict with pending fields applied
+        """
+        if document is not None:
+            if pending is None:
+                pending = self.get_pending(document.get("documentId"))
+            if fields is not None:
+                pending = {field: value for field, value in pending.items() if field in fields}
+            document.update(pending)
+        return document
+
+    def flush(self):
+        """Write all pending updates to MongoDB
+
+        Returns:
+            Number of documents written
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch = self._pending
+                self._pending = {}
+                self._inflight = batch
+
+            operations = [
+                UpdateOne({"documentId": document_id}, {"$set": fields})
+                for document_id, fields in batch.items()
+            ]
+
+            try:
+                db = self._get_db()
+                if db is None:
+                    raise RuntimeError("Database connection failed")
+                db[self.collection_name].bulk_write(operations, ordered=True)
+            except Exception as e:
+                print(f"Error flushing write buffer: {str(e)}")
+                self._requeue(batch)
+                with self._lock:
+                    self._counters["failed"] += len(batch)
+                return 0
+
+            with self._lock:
+                self._inflight = {}
+                self._counters["flushed"] += len(batch)
+                self._counters["batches"] += 1
+            return len(batch)
+
+    def get_stats(self):
+        """Get write buffer counters
+
+        Returns:
+            Dict containing pending, flushed and failed write counts
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["pending"] = len(self._pending)
+            stats["inFlight"] = len(self._inflight)
+        stats["maxPending"] = self.max_pending
+        stats["flushInterval"] = self.flush_interval
+        return stats
+
+    def close(self):
+        """Stop the background flusher and flush remaining updates"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+        self._run_callbacks()
+
+    def _get_db(self):
+        """Reuse one database handle instead of connecting per write"""
+        if self._db is None:
+            self._db = get_database()
+        return self._db
+
+    def _requeue(self, batch):
+        """Put a failed batch back without overwriting newer updates"""
+        with self._lock:
+            for document_id, fields in batch.items():
+                newer = self._pending.get(document_id)
+                merged = dict(fields)
+                if newer:
+                    merged.update(newer)
+                self._pending[document_id] = merged
+            self._inflight = {}
+        # Drop the cached handle so the next flush reconnects
+        self._db = None
+
+    def _run_callbacks(self):
+        """Call the registered flush callbacks"""
+        for callback in self._flush_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in write buffer flush callback: {str(e)}")
+
+    def _run(self):
+        """Background loop flushing on the size or time threshold"""
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error in write buffer flusher: {str(e)}")
+                time.sleep(self.flush_interval)
+            self._run_callbacks()
@@ -0,0 +1,63 @@
+"""Move cold documents between the raw and compressed storage tiers
+
+Usage (from the api directory):
+    python migrate_storage.py --days 30            # compress documents untouched for 30 days
+    python migrate_storage.py --days 30 --dry-run  # only list them
+    python migrate_storage.py --restore documents/<id>/<filename>
+    python migrate_storage.py --rescan             # recompute cold tier totals from disk
+"""
+import argparse
+import time
+from dotenv import load_dotenv
+from services.storage_service import StorageService
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate cold documents to the compressed storage tier")
+    parser.add_argument("--days", type=float, default=30, help="Compress documents untouched for this many days")
+    parser.add_argument("--dry-run", action="store_true", help="List cold documents without moving them")
+    parser.add_argument("--restore", metavar="PATH", help="Move one document back to the raw tier")
+    parser.add_argument("--rescan", action="store_true", help="Recompute the cold tier totals from disk")
+    args = parser.parse_args()
+
+    load_dotenv()
+    storage = StorageService()
+
+    if args.restore:
+        print(storage.restore(args.restore))
+        return
+
+    if args.rescan:
+        print(storage.scan_cold_tier())
+        return
+
+    cold_documents = storage.find_cold_documents(args.days)
+    print(f"Found {len(cold_documents)} documents untouched for {args.days:g} days")
+    if args.dry_run:
+        for file_path in cold_documents:
+            print(file_path)
+        return
+
+    started = time.perf_counter()
+    errors = skipped = compressed = original_bytes = compressed_bytes = 0
+    for file_path in cold_documents:
+        try:
+            result = storage.compress(file_path)
+            print(f"{result['status']}: {file_path}")
+        except Exception as e:
+            errors += 1
+            print(f"Error compressing {file_path}: {str(e)}")
+            continue
+        if result["status"] == "compressed":
+            compressed += 1
+            original_bytes += result["originalSize"]
+            compressed_bytes += result["compressedSize"]
+        else:
+            skipped += 1
+
+    elapsed = time.perf_counter() - started
+    print(f"Compressed {compressed} documents, skipped {skipped}, {errors} errors in {elapsed:.1f}s")
+    print(f"Original bytes: {original_bytes}, compressed bytes: {compressed_bytes}, "
+          f"saved: {original_bytes - compressed_bytes}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+import os
+import math
+import queue
+import time
+import shutil
+import threading
+from collections import OrderedDict
+
+# Limits, configurable via environment variables
+ADMISSION_MAX_CONCURRENT_UPLOADS = int(os.getenv("ADMISSION_MAX_CONCURRENT_UPLOADS", "8"))
+ADMISSION_MAX_INFLIGHT_BYTES = int(os.getenv("ADMISSION_MAX_INFLIGHT_BYTES", str(1024 ** 3)))
+ADMISSION_MAX_PENDING_JOBS = int(os.getenv("ADMISSION_MAX_PENDING_JOBS", "200"))
+ADMISSION_MIN_FREE_DISK_BYTES = int(os.getenv("ADMISSION_MIN_FREE_DISK_BYTES", str(1024 ** 3)))
+# Unset by default: derived from the server thread count (see AdmissionController)
+ADMISSION_READ_PRIORITY_THRESHOLD = os.getenv("ADMISSION_READ_PRIORITY_THRESHOLD")
+ADMISSION_CLIENT_RATE = float(os.getenv("ADMISSION_CLIENT_RATE", "2"))
+ADMISSION_CLIENT_BURST = float(os.getenv("ADMISSION_CLIENT_BURST", "20"))
+ADMISSION_MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", "10000"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+PROCESSING_WORKERS = int(os.getenv("PROCESSING_WORKERS", "4"))
+PROCESSING_SHUTDOWN_TIMEOUT = float(os.getenv("PROCESSING_SHUTDOWN_TIMEOUT", "20"))
+
+# gunicorn threads per worker, as passed to --threads in the Procfile
+WEB_THREADS = int(os.getenv("WEB_THREADS", "32"))
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed by admission control"""
+
+    def __init__(self, status_code, reason, retry_after):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Token bucket refilled at a fixed rate up to a burst size"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def refill(self):
+        """Add the tokens accumulated since the last update"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_consume(self, tokens=1):
+        """Take tokens from the bucket
+
+        Returns:
+            0 if the tokens were taken, otherwise seconds until they are available
+        """
+        self.refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0
+        if self.rate <= 0:
+            return ADMISSION_RETRY_AFTER
+        return (tokens - self.tokens) / self.rate
+
+class AdmissionController:
+    """Admission control for the upload and processing paths
+
+    Sheds uploads (429 or 503 with Retry-After) when a client exceeds its
+    rate, when too many uploads, bytes or background jobs are in flight,
+    when disk space runs low, or when read requests are backing up, so
+    that cheap read endpoints keep being served under ingest bursts.
+    Background processing runs on a bounded worker pool.
+    """
+
+    def __init__(self, storage_path=None, web_threads=WEB_THREADS, reserved_threads=0):
+        """Initialize the admission controller
+
+        Args:
+            storage_path: Directory whose filesystem is checked for free space
+            web_threads: Number of server threads handling requests
+            reserved_threads: Threads held by long-lived requests (e.g. event streams)
+        """
+        self.storage_path = storage_path or os.getenv("STORAGE_PATH", "./storage")
+        self.max_concurrent_uploads = ADMISSION_MAX_CONCURRENT_UPLOADS
+        self.max_inflight_bytes = ADMISSION_MAX_INFLIGHT_BYTES
+        self.max_pending_jobs = ADMISSION_MAX_PENDING_JOBS
+        self.min_free_disk_bytes = ADMISSION_MIN_FREE_DISK_BYTES
+        self.web_threads = web_threads
+        self.read_priority_threshold = self._get_read_priority_threshold(web_threads, reserved_threads)
+
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # client ID -> TokenBucket, least recently used first
+        self._active_uploads = 0
+        self._active_reads = 0
+        self._inflight_bytes = 0
+        self._pending_jobs = 0
+        self._counters = {
+            "admitted": 0,
+            "shed": {},  # reason -> count
+            "jobsCompleted": 0,
+            "jobsDropped": 0
+        }
+
+        # Daemon workers, so interpreter shutdown does not wait for the
+        # whole queue; shutdown() drops queued jobs and waits for running ones
+        self._jobs = queue.Queue()
+        self._running_jobs = 0
+        self._idle = threading.Condition(self._lock)
+        self._accepting = True
+        for number in range(PROCESSING_WORKERS):
+            worker = threading.Thread(target=self._work, name=f"processing-{number}")
+            worker.daemon = True
+            worker.start()
+
+    def acquire_upload(self, client_id, content_length=None):
+        """Admit an upload or raise AdmissionRejected
+
+        Args:
+            client_id: Identifier of the client (e.g. its IP address)
+            content_length: Size of the request body if known
+
+        Returns:
+            Number of bytes reserved; pass it to end_upload()
+        """
+        reserved = content_length or 0
+        with self._lock:
+            if self._active_reads >= self.read_priority_threshold:
+                self._shed("readPriority")
+                raise AdmissionRejected(503, "Server busy serving reads", ADMISSION_RETRY_AFTER)
+            if self._active_uploads >= self.max_concurrent_uploads:
+                self._shed("concurrentUploads")
+                raise AdmissionRejected(503, "Too many concurrent uploads", ADMISSION_RETRY_AFTER)
+            if self._pending_jobs >= self.max_pending_jobs:
+                self._shed("pendingJobs")
+                raise AdmissionRejected(503, "Too much pending processing work", ADMISSION_RETRY_AFTER)
+            if self._inflight_bytes + reserved > self.max_inflight_bytes and self._inflight_bytes > 0:
+                self._shed("inflightBytes")
+                raise AdmissionRejected(503, "Too many bytes in flight", ADMISSION_RETRY_AFTER)
+            if not self._has_free_disk(reserved):
+                self._shed("diskSpace")
+                raise AdmissionRejected(503, "Insufficient storage space", ADMISSION_RETRY_AFTER)
+
+            # Rate limit last so shed requests do not use up the client's tokens
+            wait = self._get_bucket(client_id).try_consume()
+            if wait:
+                self._shed("clientRate")
+                raise AdmissionRejected(429, "Upload rate limit exceeded", math.ceil(wait))
+
+            self._active_uploads += 1
+            self._inflight_bytes += reserved
+            self._counters["admitted"] += 1
+        return reserved
+
+    def end_upload(self, reserved, stored_bytes=0):
+        """Finish an admitted upload
+
+        Args:
+            reserved: Value returned by acquire_upload()
+            stored_bytes: Bytes that stay in flight until processing completes
+
+        Returns:
+            Number of bytes still held; pass it to submit_job()
+        """
+        with self._lock:
+            self._active_uploads -= 1
+            self._inflight_bytes += stored_bytes - reserved
+        return stored_bytes
+
+    def submit_job(self, fn, *args, held_bytes=0, on_drop=None):
+        """Run background processing on the bounded worker pool
+
+        Args:
+            fn: Function to run
+            args: Arguments for fn
+            held_bytes: In-flight bytes released when the job finishes
+            on_drop: Function called with args if the job is dropped on shutdown
+        """
+        with self._lock:
+            accepting = self._accepting
+            if accepting:
+                self._pending_jobs += 1
+            else:
+                self._inflight_bytes -= held_bytes
+                self._counters["jobsDropped"] += 1
+        if not accepting:
+            self._run_drop_callback(on_drop, args)
+            raise RuntimeError("Processing is shutting down")
+        self._jobs.put((fn, args, held_bytes, on_drop))
+
+    def shutdown(self, timeout=PROCESSING_SHUTDOWN_TIMEOUT):
+        """Drop queued jobs and wait for running ones to finish
+
+        Call before flushing buffered writes on exit, so the flush is not
+        held up by a long queue of processing jobs. Each dropped job's
+        on_drop callback runs first, so its final status is flushed too.
+
+        Args:
+            timeout: Maximum number of seconds to wait for running jobs
+
+        Returns:
+            Number of queued jobs that were dropped
+        """
+        with self._lock:
+            self._accepting = False
+
+        dropped = 0
+        while True:
+            try:
+                _, args, held_bytes, on_drop = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            dropped += 1
+            with self._lock:
+                self._pending_jobs -= 1
+                self._inflight_bytes -= held_bytes
+                self._counters["jobsDropped"] += 1
+            self._run_drop_callback(on_drop, args)
+
+        with self._idle:
+            self._idle.wait_for(lambda: self._running_jobs == 0, timeout)
+        if dropped:
+            print(f"Dropped {dropped} queued processing jobs on shutdown")
+        return dropped
+
+    def begin_read(self):
+        """Track a read request in progress"""
+        with self._lock:
+            self._active_reads += 1
+
+    def end_read(self):
+        """Track the end of a read request"""
+        with self._lock:
+            self._active_reads -= 1
+
+    def get_stats(self):
+        """Get admission counters and current load
+
+        Returns:
+            Dict of admitted and shed counts, in-flight work and limits
+        """
+        with self._lock:
+            shed = dict(self._counters["shed"])
+            return {
+                "admitted": self._counters["admitted"],
+                "shed": shed,
+                "shedTotal": sum(shed.values()),
+                "jobsCompleted": self._counters["jobsCompleted"],
+                "jobsDropped": self._counters["jobsDropped"],
+                "activeUploads": self._active_uploads,
+                "activeReads": self._active_reads,
+                "inflightBytes": self._inflight_bytes,
+                "pendingJobs": self._pending_jobs,
+                "trackedClients": len(self._buckets),
+                "limits": {
+                    "maxConcurrentUploads": self.max_concurrent_uploads,
+                    "maxInflightBytes": self.max_inflight_bytes,
+                    "maxPendingJobs": self.max_pending_jobs,
+                    "minFreeDiskBytes": self.min_free_disk_bytes,
+                    "readPriorityThreshold": self.read_priority_threshold,
+                    "webThreads": self.web_threads,
+                    "clientRate": ADMISSION_CLIENT_RATE,
+                    "clientBurst": ADMISSION_CLIENT_BURST,
+                    "processingWorkers": PROCESSING_WORKERS
+                }
+            }
+
+    def _get_bucket(self, client_id):
+        """Get a client's token bucket; caller must hold the lock
+
+        Buckets are kept in a bounded LRU map: the least recently seen
+        client is forgotten once ADMISSION_MAX_CLIENTS is reached.
+        """
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            if len(self._buckets) >= ADMISSION_MAX_CLIENTS:
+                self._buckets.popitem(last=False)
+            bucket = TokenBucket(ADMISSION_CLIENT_RATE, ADMISSION_CLIENT_BURST)
+            self._buckets[client_id] = bucket
+        else:
+            self._buckets.move_to_end(client_id)
+        return bucket
+
+    def _work(self):
+        """Worker loop running queued processing jobs"""
+        while True:
+            fn, args, held_bytes, _ = self._jobs.get()
+            with self._lock:
+                self._running_jobs += 1
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Error in processing job: {str(e)}")
+            finally:
+                with self._lock:
+                    self._running_jobs -= 1
+                    self._pending_jobs -= 1
+                    self._inflight_bytes -= held_bytes
+                    self._counters["jobsCompleted"] += 1
+                    self._idle.notify_all()
+
+    def _get_read_priority_threshold(self, web_threads, reserved_threads):
+        """Number of reads in progress above which uploads are shed
+
+        Defaults to half of the threads left over by long-lived requests.
+        The threshold must stay below the thread count, otherwise the
+        threads run out before it is reached and it never fires.
+        """
+        available = max(1, web_threads - reserved_threads)
+        if ADMISSION_READ_PRIORITY_THRESHOLD is None:
+            return max(1, available // 2)
+
+        threshold = int(ADMISSION_READ_PRIORITY_THRESHOLD)
+        if threshold >= available:
+            print(f"ADMISSION_READ_PRIORITY_THRESHOLD={threshold} is not below the {available} "
+                  f"request threads left by WEB_THREADS={web_threads}; using {max(1, available - 1)}")
+            threshold = max(1, available - 1)
+        return threshold
+
+    def _run_drop_callback(self, on_drop, args):
+        """Call a dropped job's on_drop callback"""
+        if on_drop is None:
+            return
+        try:
+            on_drop(*args)
+        except Exception as e:
+            print(f"Error handling dropped processing job: {str(e)}")
+
+    def _has_free_disk(self, needed_bytes):
+        """Check free space on the storage filesystem"""
+        if self.min_free_disk_bytes <= 0:
+            return True
+        try:
+            free = shutil.disk_usage(self.storage_path).free
+        except OSError:
+            return True
+        return free - needed_bytes >= self.min_free_disk_bytes
+
+    def _shed(self, reason):
+        """Count a shed request; caller must hold the lock"""
+        shed = self._counters["shed"]
+        shed[reason] = shed.get(reason, 0) + 1
@@ -0,0 +1,136 @@
+import re
+import hashlib
+
+# MinHash / LSH parameters. SIGNATURE_SIZE must equal LSH_BANDS * LSH_ROWS.
+# With 32 bands of 4 rows, pairs with Jaccard similarity around 0.42 have
+# a 50% chance of becoming candidates; at 0.7 it is over 99%.
+SHINGLE_SIZE = 3
+SIGNATURE_SIZE = 128
+LSH_BANDS = 32
+LSH_ROWS = 4
+
+# Signatures use one-permutation hashing: each shingle is hashed once and
+# the hash both picks one of SIGNATURE_SIZE bins and gives the value kept
+# (the minimum) in that bin. Every shingle is used, so the fraction of
+# matching bins still estimates the Jaccard similarity, at a cost linear
+# in the document length instead of SIGNATURE_SIZE hashes per shingle.
+# Empty bins borrow from the next non-empty bin, offset by the distance
+# so borrowed values only match values borrowed the same way.
+_HASH_BITS = 63  # keeps values in MongoDB's int64 range
+_BIN_RANGE = (1 << _HASH_BITS) // SIGNATURE_SIZE
+
+def _hash64(value):
+    """Stable 64-bit hash of a string (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+def get_shingles(text, size=SHINGLE_SIZE):
+    """Split text into a set of word shingles"""
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return set()
+    if len(words) < size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def compute_minhash(text):
+    """Compute the MinHash signature of a text
+
+    Returns:
+        List of SIGNATURE_SIZE integers, or None if the text has no words
+    """
+    shingles = get_shingles(text)
+    if not shingles:
+        return None
+
+    bins = [None] * SIGNATURE_SIZE
+    for shingle in shingles:
+        index, value = divmod(_hash64(shingle) >> (64 - _HASH_BITS), _BIN_RANGE)
+        if bins[index] is None or value < bins[index]:
+            bins[index] = value
+
+    signature = []
+    for index in range(SIGNATURE_SIZE):
+        for distance in range(SIGNATURE_SIZE):
+            value = bins[(index + distance) % SIGNATURE_SIZE]
+            if value is not None:
+                signature.append(value + distance * _BIN_RANGE)
+                break
+    return signature
+
+def compute_lsh_bands(signature):
+    """Compute the LSH band keys of a MinHash signature
+
+    Documents sharing at least one band key are near-duplicate candidates.
+    """
+    bands = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.blake2b(",".join(map(str, rows)).encode("ascii"), digest_size=8).hexdigest()
+        bands.append(f"{band}:{digest}")
+    return bands
+
+def estimate_jaccard(signature, other_signature):
+    """Estimate the Jaccard similarity of two documents from their signatures"""
+    if not signature or not other_signature or len(signature) != len(other_signature):
+        return 0.0
+    matches = sum(1 for a, b in zip(signature, other_signature) if a == b)
+    return matches / len(signature)
+
+def build_candidate_pipeline(collection_name, document_id, bands, max_scanned, max_candidates):
+    """Build the aggregation pipeline looking up near-duplicate candidates
+
+    Looks up each LSH band separately (served by the multikey index on
+    similarity.bands) with an equal share of max_scanned, then counts the
+    bands each candidate shares and ranks by that count. Capping every
+    band rather than the whole match keeps the work bounded without a
+    very common band (e.g. boilerplate text) crowding out the documents
+    that share many bands.
+
+    Args:
+        collection_name: Collection holding the documents
+        document_id: Document to exclude from the results
+        bands: LSH band keys of the document
+        max_scanned: Maximum number of band matches examined in total
+        max_candidates: Maximum number of ranked candidates returned
+
+    Returns:
+        List of pipeline stages
+    """
+    per_band = max(1, max_scanned // len(bands))
+
+    def band_lookup(band):
+        return [
+            {"$match": {"similarity.bands": band, "documentId": {"$ne": document_id}}},
+            {"$limit": per_band},
+            {"$project": {
+                "_id": 0,
+                "documentId": 1,
+                "filename": 1,
+                "title": 1,
+                "minhash": "$similarity.minhash"
+            }}
+        ]
+
+    pipeline = band_lookup(bands[0])
+    for band in bands[1:]:
+        pipeline.append({"$unionWith": {"coll": collection_name, "pipeline": band_lookup(band)}})
+    pipeline += [
+        {"$group": {
+            "_id": "$documentId",
+            "filename": {"$first": "$filename"},
+            "title": {"$first": "$title"},
+            "minhash": {"$first": "$minhash"},
+            "sharedBands": {"$sum": 1}
+        }},
+        {"$sort": {"sharedBands": -1}},
+        {"$limit": max_candidates},
+        {"$project": {
+            "_id": 0,
+            "documentId": "$_id",
+            "filename": 1,
+            "title": 1,
+            "minhash": 1,
+            "sharedBands": 1
+        }}
+    ]
+    return pipeline
@@ -5,6 +5,7 @@ from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from nltk.probability import FreqDist
 import PyPDF2
+from services.ai.similarity import compute_minhash
 
 # Ensure NLTK data is downloaded
 try:
@@ -117,7 +118,8 @@ def analyze_document(file_path, content_type=None):
                 "tags": ["image", ext[1:], "visual"],
                 "summary": "Image file - no text extracted",
                 "language": "unknown",
-                "characterCount": 0
+                "characterCount": 0,
+                "minhash": None
             }
         return {
             "text": "",
@@ -125,7 +127,8 @@ def analyze_document(file_path, content_type=None):
             "tags": [ext[1:] if ext else "unknown"],
             "summary": "No text content extracted",
             "language": "unknown",
-            "characterCount": 0
+            "characterCount": 0,
+            "minhash": None
         }
     
     # Process extracted text
@@ -141,5 +144,6 @@ def analyze_document(file_path, content_type=None):
         "tags": tags,
         "summary": summary,
         "language": "en",  # Default to English
-        "characterCount": len(text)
+        "characterCount": len(text),
+        "minhash": compute_minhash(text)  # For near-duplicate detection
     }
\ No newline at end of file
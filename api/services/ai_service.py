@@ -1,5 +1,6 @@
 import os
 from services.ai.text_analysis import analyze_document
+from services.storage_service import StorageService
 
 class AIService:
     """Service for AI processing of documents"""
@@ -7,6 +8,7 @@ class AIService:
     def __init__(self):
         """Initialize the AI service"""
         self.storage_path = os.getenv("STORAGE_PATH", "./storage")
+        self.storage = StorageService(self.storage_path)
     
     def process_document(self, document_id, file_path, content_type=None):
         """Process a document with AI
@@ -20,11 +22,9 @@ class AIService:
             Dict containing AI-generated metadata
         """
         try:
-            # Create full path
-            full_path = os.path.join(self.storage_path, file_path)
-            
-            # Analyze document
-            analysis = analyze_document(full_path, content_type)
+            # Analyze document (decompressed first if it is in the cold tier)
+            with self.storage.local_path(file_path) as full_path:
+                analysis = analyze_document(full_path, content_type)
             
             # Return analysis results
             return {
@@ -35,7 +35,8 @@ class AIService:
                 "tags": analysis.get("tags", []),
                 "summary": analysis.get("summary", ""),
                 "language": analysis.get("language", "unknown"),
-                "characterCount": analysis.get("characterCount", 0)
+                "characterCount": analysis.get("characterCount", 0),
+                "minhash": analysis.get("minhash")
             }
         except Exception as e:
             print(f"Error processing document with AI: {str(e)}")
@@ -1,6 +1,7 @@
 import os
 import hashlib
 from services.blockchain.simulated_blockchain import Blockchain
+from services.storage_service import StorageService
 
 # Global blockchain instance
 _blockchain = Blockchain()
@@ -12,6 +13,7 @@ class BlockchainService:
         """Initialize the blockchain service"""
         self.blockchain = _blockchain
         self.storage_path = os.getenv("STORAGE_PATH", "./storage")
+        self.storage = StorageService(self.storage_path)
     
     def calculate_file_hash(self, file_path):
         """Calculate SHA-256 hash of a file
@@ -23,18 +25,47 @@ class BlockchainService:
             SHA-256 hash as a hex string
         """
         try:
-            sha256_hash = hashlib.sha256()
-            
             with open(file_path, "rb") as f:
-                # Read and update hash in chunks of 4K
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-                    
-            return sha256_hash.hexdigest()
+                return self.calculate_stream_hash(f)
         except Exception as e:
             print(f"Error calculating file hash: {str(e)}")
             return None
     
+    def calculate_stream_hash(self, f):
+        """Calculate SHA-256 hash of an open binary file object
+        
+        Args:
+            f: File object positioned at the start
+            
+        Returns:
+            SHA-256 hash as a hex string
+        """
+        sha256_hash = hashlib.sha256()
+        
+        # Read and update hash in chunks of 4K
+        for byte_block in iter(lambda: f.read(4096), b""):
+            sha256_hash.update(byte_block)
+            
+        return sha256_hash.hexdigest()
+    
+    def calculate_document_hash(self, file_path):
+        """Calculate SHA-256 hash of a stored document's original bytes
+        
+        Works for documents in either storage tier.
+        
+        Args:
+            file_path: Path relative to the storage root
+            
+        Returns:
+            SHA-256 hash as a hex string
+        """
+        try:
+            with self.storage.open(file_path) as f:
+                return self.calculate_stream_hash(f)
+        except Exception as e:
+            print(f"Error calculating document hash: {str(e)}")
+            return None
+    
     def register_document(self, document_id, file_path, metadata=None):
         """Register a document on the blockchain
         
@@ -48,8 +79,7 @@ class BlockchainService:
         """
         try:
             # Calculate document hash
-            full_path = os.path.join(self.storage_path, file_path)
-            document_hash = self.calculate_file_hash(full_path)
+            document_hash = self.calculate_document_hash(file_path)
             
             if not document_hash:
                 return {
@@ -95,8 +125,7 @@ class BlockchainService:
             # If file path is provided, recalculate hash
             document_hash = None
             if file_path:
-                full_path = os.path.join(self.storage_path, file_path)
-                document_hash = self.calculate_file_hash(full_path)
+                document_hash = self.calculate_document_hash(file_path)
             
             # Query blockchain for verification
             if document_hash:
@@ -0,0 +1,119 @@
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+# Number of recent events kept for clients resuming with Last-Event-ID
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "10000"))
+
+class EventBus:
+    """In-process event bus for document status transitions
+
+    Background processors publish events here and streaming endpoints
+    wait on them. Recent events are kept in a bounded history so clients
+    can resume from the last event ID they received. Subscribers only see
+    events published in the same process, so the app must run with a
+    single worker.
+    """
+
+    def __init__(self, history_size=EVENT_HISTORY_SIZE):
+        """Initialize the event bus
+
+        Args:
+            history_size: Maximum number of events kept for resuming
+        """
+        self._events = deque(maxlen=history_size)
+        self._condition = threading.Condition()
+        self._last_id = 0
+
+    @property
+    def last_event_id(self):
+        """ID of the most recently published event"""
+        with self._condition:
+            return self._last_id
+
+    def can_resume(self, after_id):
+        """Check whether no events after the given ID have been dropped
+
+        Args:
+            after_id: Last event ID the client received
+
+        Returns:
+            True if every event after after_id is still in the history
+        """
+        with self._condition:
+            if after_id > self._last_id:
+                return False
+            return not self._events or self._events[0]["id"] <= after_id + 1
+
+    def publish(self, document_id, event_type, data=None):
+        """Publish an event for a document
+
+        Args:
+            document_id: Document ID
+            event_type: Event name, e.g. "status" or "blockchain"
+            data: Dict with the event payload
+
+        Returns:
+            The published event dict
+        """
+        with self._condition:
+            self._last_id += 1
+            event = {
+                "id": self._last_id,
+                "documentId": document_id,
+                "event": event_type,
+                "timestamp": datetime.now().isoformat(),
+                "data": data or {}
+            }
+            self._events.append(event)
+            self._condition.notify_all()
+        return event
+
+    def get_events(self, document_ids, after_id=0):
+        """Get buffered events for the given documents
+
+        Args:
+            document_ids: Set of document IDs to filter on
+            after_id: Only return events with a greater ID
+
+        Returns:
+            List of matching events, oldest first
+        """
+        with self._condition:
+            return self._collect(document_ids, after_id)
+
+    def wait_for_events(self, document_ids, after_id=0, timeout=None):
+        """Block until events for the given documents are published
+
+        Args:
+            document_ids: Set of document IDs to filter on
+            after_id: Only return events with a greater ID
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            Tuple of (matching events, ID of the latest event examined).
+            Pass the ID back as after_id so events for other documents
+            are not scanned again.
+        """
+        with self._condition:
+            events = self._collect(document_ids, after_id)
+            if events:
+                return events, self._last_id
+            seen_id = max(after_id, self._last_id)
+            self._condition.wait_for(lambda: self._last_id > seen_id, timeout)
+            return self._collect(document_ids, seen_id), self._last_id
+
+    def _collect(self, document_ids, after_id):
+        """Collect matching events; caller must hold the condition
+
+        Only the events newer than after_id are visited, newest first.
+        """
+        events = []
+        for event in reversed(self._events):
+            if event["id"] <= after_id:
+                break
+            if event["documentId"] in document_ids:
+                events.append(event)
+        events.reverse()
+        return events
@@ -0,0 +1,457 @@
+import os
+import io
+import time
+import zlib
+import struct
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from database.mongodb import get_database
+
+# Compressed tier layout:
+#   header:  MAGIC, chunk size (uint32), original size (uint64)
+#   chunks:  zlib-compressed chunks of the original bytes
+#   index:   (offset uint64, compressed length uint32) per chunk
+#   footer:  index offset (uint64), chunk count (uint32), MAGIC
+MAGIC = b"ARCZ\x01"
+HEADER = struct.Struct("<IQ")
+INDEX_ENTRY = struct.Struct("<QI")
+FOOTER = struct.Struct("<QI")
+COMPRESSED_SUFFIX = ".arcz"
+
+STORAGE_CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", str(1024 * 1024)))
+STORAGE_COMPRESSION_LEVEL = int(os.getenv("STORAGE_COMPRESSION_LEVEL", "6"))
+
+# Cold tier totals are kept in MongoDB so every process (the API and
+# migrate_storage.py) sees the same numbers
+STORAGE_STATS_COLLECTION = "stats"
+STORAGE_STATS_ID = "storage"
+
+# Extensions that are already compressed and not worth recompressing
+INCOMPRESSIBLE_EXTENSIONS = {
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".mp3", ".mp4", ".zip",
+    ".gz", ".bz2", ".xz", ".7z", ".docx", ".xlsx", ".pptx"
+}
+
+class StorageMetrics:
+    """Activity counters shared by all StorageService instances in a process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {
+            "filesCompressed": 0,
+            "filesRestored": 0,
+            "filesSkipped": 0,
+            "decompressedBytes": 0,
+            "decompressSeconds": 0.0
+        }
+
+    def add(self, **values):
+        """Add to one or more counters"""
+        with self._lock:
+            for name, value in values.items():
+                self._counters[name] += value
+
+    def to_dict(self):
+        """Get the counters plus derived throughput"""
+        with self._lock:
+            metrics = dict(self._counters)
+        seconds = metrics["decompressSeconds"]
+        metrics["decompressThroughput"] = metrics["decompressedBytes"] / seconds if seconds else 0.0
+        return metrics
+
+_metrics = StorageMetrics()
+
+class CompressedReader(io.RawIOBase):
+    """Seekable reader for a file in the compressed tier
+
+    Only the chunks covering the requested range are decompressed, so
+    range reads do not need to decompress the whole file.
+    """
+
+    def __init__(self, path, metrics=None):
+        self._file = open(path, "rb")
+        self._metrics = metrics or _metrics
+        try:
+            if self._file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a compressed storage file: {path}")
+            self.chunk_size, self.size = HEADER.unpack(self._file.read(HEADER.size))
+
+            self._file.seek(-(FOOTER.size + len(MAGIC)), os.SEEK_END)
+            index_offset, chunk_count = FOOTER.unpack(self._file.read(FOOTER.size))
+            if self._file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Truncated compressed storage file: {path}")
+
+            self._file.seek(index_offset)
+            index_bytes = self._file.read(INDEX_ENTRY.size * chunk_count)
+            self._index = [entry for entry in INDEX_ENTRY.iter_unpack(index_bytes)]
+        except Exception:
+            self._file.close()
+            raise
+
+        self._position = 0
+        self._cached_chunk = None
+        self._cached_data = b""
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self._position + offset
+        elif whence == os.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    def readinto(self, buffer):
+        if self._position >= self.size:
+            return 0
+        chunk_number, chunk_offset = divmod(self._position, self.chunk_size)
+        data = self._read_chunk(chunk_number)
+        count = min(len(buffer), len(data) - chunk_offset)
+        buffer[:count] = data[chunk_offset:chunk_offset + count]
+        self._position += count
+        return count
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+    def _read_chunk(self, chunk_number):
+        """Decompress one chunk, reusing the last one read"""
+        if chunk_number != self._cached_chunk:
+            offset, length = self._index[chunk_number]
+            self._file.seek(offset)
+            started = time.perf_counter()
+            self._cached_data = zlib.decompress(self._file.read(length))
+            self._metrics.add(
+                decompressedBytes=len(self._cached_data),
+                decompressSeconds=time.perf_counter() - started
+            )
+            self._cached_chunk = chunk_number
+        return self._cached_data
+
+class StorageService:
+    """Tiered document storage
+
+    Documents are written raw to the hot tier under storage_path. Cold
+    documents can be moved to a compressed tier (by default
+    <storage_path>/cold) in a chunked, seekable format; reads go through
+    this service and decompress transparently, so hashes stay defined
+    over the original bytes.
+    """
+
+    def __init__(self, storage_path=None, cold_storage_path=None):
+        """Initialize the storage service
+
+        Args:
+            storage_path: Root of the hot (raw) tier
+            cold_storage_path: Root of the compressed tier
+        """
+        self.storage_path = storage_path or os.getenv("STORAGE_PATH", "./storage")
+        self.cold_storage_path = cold_storage_path or os.getenv(
+            "COLD_STORAGE_PATH", os.path.join(self.storage_path, "cold")
+        )
+        self.metrics = _metrics
+        self._db = None
+
+    def hot_path(self, file_path):
+        """Full path of a document in the hot tier"""
+        return os.path.join(self.storage_path, file_path)
+
+    def cold_path(self, file_path):
+        """Full path of a document in the compressed tier"""
+        return os.path.join(self.cold_storage_path, file_path + COMPRESSED_SUFFIX)
+
+    def get_tier(self, file_path):
+        """Get the tier a document is stored in
+
+        Returns:
+            "hot", "cold" or None if the document does not exist
+        """
+        if os.path.exists(self.hot_path(file_path)):
+            return "hot"
+        if os.path.exists(self.cold_path(file_path)):
+            return "cold"
+        return None
+
+    def exists(self, file_path):
+        """Check whether a document exists in either tier"""
+        return self.get_tier(file_path) is not None
+
+    def get_size(self, file_path):
+        """Get the original size of a document in bytes"""
+        try:
+            return os.path.getsize(self.hot_path(file_path))
+        except FileNotFoundError:
+            with CompressedReader(self.cold_path(file_path), self.metrics) as reader:
+                return reader.size
+
+    def open(self, file_path):
+        """Open a document for binary reading from whichever tier holds it
+
+        Args:
+            file_path: Path relative to the storage root
+
+        Returns:
+            Seekable binary file object over the original bytes
+        """
+        try:
+            return open(self.hot_path(file_path), "rb")
+        except FileNotFoundError:
+            # Fall back to the compressed tier (also covers a file
+            # being moved there between the two lookups)
+            return io.BufferedReader(CompressedReader(self.cold_path(file_path), self.metrics))
+
+    def read_range(self, file_path, start, length):
+        """Read part of a document without decompressing all of it
+
+        Args:
+            file_path: Path relative to the storage root
+            start: Offset of the first byte
+            length: Number of bytes to read
+
+        Returns:
+            The requested bytes (fewer at the end of the file)
+        """
+        with self.open(file_path) as f:
+            f.seek(start)
+            return f.read(length)
+
+    @contextmanager
+    def local_path(self, file_path):
+        """Provide a filesystem path to the original bytes of a document
+
+        For code that needs a real file (e.g. PDF parsing). Cold
+        documents are decompressed to a temporary file that is removed
+        afterwards.
+
+        Args:
+            file_path: Path relative to the storage root
+        """
+        hot_path = self.hot_path(file_path)
+        if os.path.exists(hot_path) or not os.path.exists(self.cold_path(file_path)):
+            yield hot_path
+            return
+
+        # Keep the original file name so extension-based handling still works
+        temp_dir = tempfile.mkdtemp(prefix="archivai-")
+        temp_path = os.path.join(temp_dir, os.path.basename(file_path))
+        try:
+            with self.open(file_path) as source, open(temp_path, "wb") as target:
+                shutil.copyfileobj(source, target, STORAGE_CHUNK_SIZE)
+            yield temp_path
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def compress(self, file_path, min_ratio=0.9):
+        """Move a document from the hot tier into the compressed tier
+
+        Args:
+            file_path: Path relative to the storage root
+            min_ratio: Keep the document raw if compressed/original is above this
+
+        Returns:
+            Dict describing the outcome
+        """
+        source_path = self.hot_path(file_path)
+        target_path = self.cold_path(file_path)
+        original_size = os.path.getsize(source_path)
+
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as target, open(source_path, "rb") as source:
+                target.write(MAGIC)
+                target.write(HEADER.pack(STORAGE_CHUNK_SIZE, original_size))
+                index = []
+                for chunk in iter(lambda: source.read(STORAGE_CHUNK_SIZE), b""):
+                    compressed = zlib.compress(chunk, STORAGE_COMPRESSION_LEVEL)
+                    index.append((target.tell(), len(compressed)))
+                    target.write(compressed)
+                index_offset = target.tell()
+                for entry in index:
+                    target.write(INDEX_ENTRY.pack(*entry))
+                target.write(FOOTER.pack(index_offset, len(index)))
+                target.write(MAGIC)
+                target.flush()
+                os.fsync(target.fileno())
+                compressed_size = target.tell()
+
+            # The container adds a fixed overhead, so empty and tiny files
+            # would grow; never store a file that does not get smaller
+            if compressed_size >= original_size or compressed_size > original_size * min_ratio:
+                os.remove(temp_path)
+                self.metrics.add(filesSkipped=1)
+                return {"status": "skipped", "path": file_path, "reason": "Poor compression ratio"}
+
+            os.replace(temp_path, target_path)
+            os.remove(source_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.metrics.add(filesCompressed=1)
+        self._record_tier_change(1, original_size, compressed_size)
+        return {
+            "status": "compressed",
+            "path": file_path,
+            "originalSize": original_size,
+            "compressedSize": compressed_size
+        }
+
+    def restore(self, file_path):
+        """Move a document from the compressed tier back to the hot tier
+
+        Args:
+            file_path: Path relative to the storage root
+
+        Returns:
+            Dict describing the outcome
+        """
+        source_path = self.cold_path(file_path)
+        target_path = self.hot_path(file_path)
+        compressed_size = os.path.getsize(source_path)
+
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as target, self.open(file_path) as source:
+                shutil.copyfileobj(source, target, STORAGE_CHUNK_SIZE)
+                target.flush()
+                os.fsync(target.fileno())
+                original_size = target.tell()
+            os.replace(temp_path, target_path)
+            os.remove(source_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.metrics.add(filesRestored=1)
+        self._record_tier_change(-1, -original_size, -compressed_size)
+        return {"status": "restored", "path": file_path, "originalSize": original_size}
+
+    def find_cold_documents(self, days, prefix="documents"):
+        """Find hot documents not read or modified for a number of days
+
+        Args:
+            days: Minimum age in days since last access or modification
+            prefix: Directory under the storage root to scan
+
+        Returns:
+            List of paths relative to the storage root
+        """
+        cutoff = time.time() - days * 86400
+        root = os.path.join(self.storage_path, prefix)
+        cold = []
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if os.path.splitext(filename)[1].lower() in INCOMPRESSIBLE_EXTENSIONS:
+                    continue
+                full_path = os.path.join(directory, filename)
+                stat = os.stat(full_path)
+                if max(stat.st_atime, stat.st_mtime) < cutoff:
+                    cold.append(os.path.relpath(full_path, self.storage_path))
+        return cold
+
+    def scan_cold_tier(self):
+        """Measure the compressed tier on disk and store the totals
+
+        Corrects the cold tier totals if they drifted, e.g. after a
+        migration ran without database access.
+
+        Returns:
+            Dict of cold file count, original bytes and compressed bytes
+        """
+        totals = {"coldFiles": 0, "originalBytes": 0, "compressedBytes": 0}
+        for directory, _, filenames in os.walk(self.cold_storage_path):
+            for filename in filenames:
+                if not filename.endswith(COMPRESSED_SUFFIX):
+                    continue
+                full_path = os.path.join(directory, filename)
+                with open(full_path, "rb") as f:
+                    if f.read(len(MAGIC)) != MAGIC:
+                        continue
+                    _, original_size = HEADER.unpack(f.read(HEADER.size))
+                totals["coldFiles"] += 1
+                totals["originalBytes"] += original_size
+                totals["compressedBytes"] += os.path.getsize(full_path)
+
+        db = self._get_db()
+        if db is None:
+            raise RuntimeError("Database connection failed")
+        db[STORAGE_STATS_COLLECTION].replace_one(
+            {"_id": STORAGE_STATS_ID},
+            dict(totals, dateScanned=time.strftime("%Y-%m-%dT%H:%M:%S")),
+            upsert=True
+        )
+        return totals
+
+    def get_tier_stats(self):
+        """Get the cold tier totals shared by all processes
+
+        Returns:
+            Dict of cold file count, original and compressed bytes and bytes saved
+        """
+        db = self._get_db()
+        if db is None:
+            raise RuntimeError("Database connection failed")
+        stats = db[STORAGE_STATS_COLLECTION].find_one({"_id": STORAGE_STATS_ID}) or {}
+        original_bytes = stats.get("originalBytes", 0)
+        compressed_bytes = stats.get("compressedBytes", 0)
+        return {
+            "coldFiles": stats.get("coldFiles", 0),
+            "originalBytes": original_bytes,
+            "compressedBytes": compressed_bytes,
+            "bytesSaved": original_bytes - compressed_bytes,
+            "dateScanned": stats.get("dateScanned")
+        }
+
+    def get_metrics(self):
+        """Get cold tier totals and this process's storage activity"""
+        metrics = self.metrics.to_dict()
+        metrics["coldTier"] = self.get_tier_stats()
+        return metrics
+
+    def _record_tier_change(self, files, original_bytes, compressed_bytes):
+        """Apply a change to the shared cold tier totals"""
+        try:
+            db = self._get_db()
+            if db is None:
+                raise RuntimeError("Database connection failed")
+            db[STORAGE_STATS_COLLECTION].update_one(
+                {"_id": STORAGE_STATS_ID},
+                {"$inc": {
+                    "coldFiles": files,
+                    "originalBytes": original_bytes,
+                    "compressedBytes": compressed_bytes
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            # The file move already happened; scan_cold_tier() corrects the totals
+            print(f"Error recording storage tier change: {str(e)}")
+            self._db = None
+
+    def _get_db(self):
+        """Reuse one database handle instead of connecting per file"""
+        if self._db is None:
+            self._db = get_database()
+        return self._db
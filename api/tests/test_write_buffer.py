@@ -0,0 +1,105 @@
+import os
+import sys
+import threading
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import write_buffer as write_buffer_module
+from database.write_buffer import WriteBuffer
+
+class FakeCollection:
+    """In-memory stand-in for a MongoDB collection's bulk_write"""
+
+    def __init__(self):
+        self.documents = {}
+        self.fail = False
+        self.during_write = None
+
+    def bulk_write(self, operations, ordered=True):
+        if self.during_write is not None:
+            self.during_write()
+        if self.fail:
+            raise RuntimeError("connection reset")
+        for operation in operations:
+            document_id = operation._filter["documentId"]
+            self.documents.setdefault(document_id, {"documentId": document_id}).update(operation._doc["$set"])
+
+    def find_one(self, document_id):
+        document = self.documents.get(document_id)
+        return dict(document) if document is not None else None
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(write_buffer_module, "get_database", lambda: {"documents": collection})
+    return collection
+
+@pytest.fixture
+def buffer(collection):
+    # Thresholds high enough that only explicit flush() calls write
+    buffer = WriteBuffer(max_pending=10000, flush_interval=3600)
+    yield buffer
+    collection.fail = False
+    collection.during_write = None
+    buffer.close()
+
+def test_coalesces_updates_per_document(buffer, collection):
+    buffer.set_fields("doc-1", {"status": "processing"})
+    buffer.set_fields("doc-1", {"status": "completed", "title": "Report"})
+
+    assert buffer.flush() == 1
+    assert collection.find_one("doc-1") == {"documentId": "doc-1", "status": "completed", "title": "Report"}
+    stats = buffer.get_stats()
+    assert stats["coalesced"] == 1
+    assert stats["pending"] == 0
+
+def test_flush_between_buffer_read_and_query_is_not_missed(buffer, collection):
+    collection.documents["doc-1"] = {"documentId": "doc-1", "status": "uploading"}
+    buffer.set_fields("doc-1", {"status": "completed"})
+
+    # Reader: buffer first, then a flush completes, then the query
+    pending = buffer.get_pending("doc-1")
+    buffer.flush()
+    assert buffer.get_pending("doc-1") == {}
+    document = buffer.apply_pending(collection.find_one("doc-1"), pending=pending)
+
+    assert document["status"] == "completed"
+
+def test_inflight_batch_stays_visible_until_written(buffer, collection):
+    collection.documents["doc-1"] = {"documentId": "doc-1", "status": "uploading"}
+    buffer.set_fields("doc-1", {"status": "completed"})
+    seen = {}
+
+    def read_during_write():
+        # Runs on another thread while the batch is being written
+        reader = threading.Thread(target=lambda: seen.update(buffer.get_all_pending()))
+        reader.start()
+        reader.join()
+
+    collection.during_write = read_during_write
+    buffer.flush()
+
+    assert seen == {"doc-1": {"status": "completed"}}
+    assert buffer.get_all_pending() == {}
+
+def test_failed_flush_is_requeued_without_overwriting_newer_updates(buffer, collection):
+    buffer.set_fields("doc-1", {"status": "processing", "title": "Draft"})
+    buffer.set_fields("doc-2", {"status": "processing"})
+    collection.fail = True
+
+    def update_during_write():
+        buffer.set_fields("doc-1", {"status": "completed"})
+
+    collection.during_write = update_during_write
+    assert buffer.flush() == 0
+    assert collection.documents == {}
+    assert buffer.get_stats()["failed"] == 2
+    assert buffer.get_pending("doc-1") == {"status": "completed", "title": "Draft"}
+
+    collection.fail = False
+    collection.during_write = None
+    assert buffer.flush() == 2
+    assert collection.find_one("doc-1") == {"documentId": "doc-1", "status": "completed", "title": "Draft"}
+    assert collection.find_one("doc-2") == {"documentId": "doc-2", "status": "processing"}
+    assert buffer.get_stats()["pending"] == 0